@@ -8,6 +8,7 @@ as tools for AI agents.
 No MCP framework dependency — uses only KeepClient and stdlib.
 """
 
+import asyncio
 import json
 import sys
 import os
@@ -101,7 +102,7 @@ def handle_keep_send(
     src: str = "bot:mcp-agent",
 ) -> dict:
     """Handle a keep_send tool call."""
-    client = KeepClient(host, port, src=src)
+    client = KeepClient.get_pooled(host, port, src=src)
     reply = client.send(
         body=params["body"],
         dst=params["dst"],
@@ -120,7 +121,7 @@ def handle_keep_discover(
     src: str = "bot:mcp-agent",
 ) -> dict:
     """Handle a keep_discover tool call."""
-    client = KeepClient(host, port, src=src)
+    client = KeepClient.get_pooled(host, port, src=src)
     query = params.get("query", "info")
     return client.discover(query)
 
@@ -131,20 +132,41 @@ def handle_keep_listen(
     port: int = 9009,
     src: str = "bot:mcp-agent",
 ) -> dict:
-    """Handle a keep_listen tool call."""
+    """Handle a keep_listen tool call.
+
+    Listens on the pooled client that keep_send and keep_discover use: the
+    server keeps one connection per src, so a second client under the same
+    identity would close the pooled one. Messages that arrived during
+    earlier sends are returned first.
+    """
     timeout = params.get("timeout", 10)
     messages = []
 
     def on_message(p):
         messages.append({"src": p.src, "body": p.body})
 
-    with KeepClient(host=host, port=port, src=src) as client:
-        client.send(body="register", dst="server", wait_reply=True)
-        client.listen(on_message, timeout=timeout)
+    client = KeepClient.get_pooled(host, port, src=src)
+    client.send(body="register", dst="server", wait_reply=True)
+    client.listen(on_message, timeout=timeout)
 
     return {"messages": messages, "count": len(messages)}
 
 
+async def handle_keep_listen_async(
+    params: dict,
+    host: str = "localhost",
+    port: int = 9009,
+    src: str = "bot:mcp-agent",
+) -> dict:
+    """Handle a keep_listen tool call without blocking the event loop.
+
+    For MCP servers that run tool handlers on an asyncio event loop. The
+    listen runs in a worker thread on the same pooled client as the sync
+    handlers, for the reason given in handle_keep_listen().
+    """
+    return await asyncio.to_thread(handle_keep_listen, params, host, port, src)
+
+
 HANDLERS = {
     "keep_send": handle_keep_send,
     "keep_discover": handle_keep_discover,
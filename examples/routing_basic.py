@@ -10,15 +10,17 @@ Then:
 Agent A ("bot:alice") listens for messages.
 Agent B ("bot:bob") sends a message to "bot:alice" through the server.
 Alice's callback prints the received packet.
+
+Both agents run as tasks on one asyncio event loop (AsyncKeepClient),
+so no listener thread is needed.
 """
 
-import threading
-import time
+import asyncio
 
-from keep.client import KeepClient
+from keep import AsyncKeepClient
 
 
-def main():
+async def main():
     received = []
 
     def on_message(packet):
@@ -26,34 +28,26 @@ def main():
         received.append(packet)
 
     # Agent A: Alice — connects and listens for routed messages
-    alice = KeepClient(src="bot:alice")
-    alice.connect()
-    # Send an initial packet to register identity with the server
-    alice.send(body="hello", dst="server", wait_reply=True)
-    print("[Alice] Registered with server")
-
-    # Start listening in a background thread
-    listener = threading.Thread(
-        target=alice.listen, args=(on_message, 5.0), daemon=True
-    )
-    listener.start()
-
-    # Give listener a moment to start
-    time.sleep(0.2)
-
-    # Agent B: Bob — sends a message to Alice through the server
-    with KeepClient(src="bot:bob") as bob:
-        # Register Bob's identity first
-        bob.send(body="hi", dst="server", wait_reply=True)
-        print("[Bob] Registered with server")
-
-        # Send to Alice (fire-and-forget in persistent mode)
-        bob.send(body="Hey Alice, want to coordinate?", dst="bot:alice")
-        print("[Bob] Sent message to bot:alice")
-
-    # Wait for listener to finish (timeout=5s)
-    listener.join()
-    alice.disconnect()
+    async with AsyncKeepClient(src="bot:alice") as alice:
+        # Send an initial packet to register identity with the server
+        await alice.send(body="hello", dst="server", wait_reply=True)
+        print("[Alice] Registered with server")
+
+        # Start listening as a concurrent task
+        listener = asyncio.create_task(alice.listen(on_message, timeout=5.0))
+
+        # Agent B: Bob — sends a message to Alice through the server
+        async with AsyncKeepClient(src="bot:bob") as bob:
+            # Register Bob's identity first
+            await bob.send(body="hi", dst="server", wait_reply=True)
+            print("[Bob] Registered with server")
+
+            # Send to Alice (fire-and-forget in persistent mode)
+            await bob.send(body="Hey Alice, want to coordinate?", dst="bot:alice")
+            print("[Bob] Sent message to bot:alice")
+
+        # Wait for listener to finish (timeout=5s)
+        await listener
 
     if received:
         print(f"\nRouting works! Alice received {len(received)} message(s).")
@@ -62,4 +56,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
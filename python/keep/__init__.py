@@ -1,9 +1,28 @@
 """keep-protocol: Signed agent-to-agent communication over TCP."""
 
-from keep.client import KeepClient
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from keep.aclient import AsyncKeepClient
+    from keep.client import KeepClient
 
 __version__ = "0.5.0"
-__all__ = ["KeepClient", "ensure_server"]
+__all__ = ["AsyncKeepClient", "KeepClient", "ensure_server"]
+
+
+def __getattr__(name: str):
+    # The clients pull in protobuf, cryptography, and (for AsyncKeepClient)
+    # asyncio; import them only when first requested, so e.g. keep.mcp can
+    # start up before any of that is needed.
+    if name == "KeepClient":
+        from keep.client import KeepClient
+
+        return KeepClient
+    if name == "AsyncKeepClient":
+        from keep.aclient import AsyncKeepClient
+
+        return AsyncKeepClient
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def ensure_server(
@@ -21,4 +40,6 @@ def ensure_server(
         ...     client = KeepClient()
         ...     reply = client.send("hello")
     """
+    from keep.client import KeepClient
+
     return KeepClient.ensure_server(host=host, port=port, timeout=timeout)
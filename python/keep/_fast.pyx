@@ -0,0 +1,148 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""Compiled framing and encoding helpers for keep.client.
+
+Optional: built by setup.py when Cython is installed. keep.client falls
+back to its pure-Python implementations when this module is missing.
+"""
+
+from cpython.bytes cimport PyBytes_AS_STRING, PyBytes_FromStringAndSize
+from libc.string cimport memcpy
+
+from operator import index
+
+
+def recv_exact(object sock, Py_ssize_t n):
+    """Read exactly n bytes from sock, with a single recv() when possible."""
+    cdef bytes data = sock.recv(n)
+    cdef Py_ssize_t got = len(data)
+    cdef Py_ssize_t r
+    if got == n:
+        return data
+    if got == 0:
+        raise ConnectionError(f"Connection closed: expected {n} bytes, got 0")
+    cdef bytearray buf = bytearray(n)
+    buf[:got] = data
+    cdef object view = memoryview(buf)
+    while got < n:
+        r = sock.recv_into(view[got:], n - got)
+        if r == 0:
+            raise ConnectionError(
+                f"Connection closed: expected {n} bytes, got {got}"
+            )
+        got += r
+    return bytes(buf)
+
+
+def frame(bytes data):
+    """Return data prefixed with its 4-byte big-endian length."""
+    cdef Py_ssize_t n = len(data)
+    cdef bytes out = PyBytes_FromStringAndSize(NULL, n + 4)
+    cdef unsigned char *p = <unsigned char *>PyBytes_AS_STRING(out)
+    p[0] = (n >> 24) & 0xFF
+    p[1] = (n >> 16) & 0xFF
+    p[2] = (n >> 8) & 0xFF
+    p[3] = n & 0xFF
+    memcpy(p + 4, PyBytes_AS_STRING(data), n)
+    return out
+
+
+cdef inline Py_ssize_t _varint_size(unsigned long long v):
+    cdef Py_ssize_t n = 1
+    while v >= 0x80:
+        v >>= 7
+        n += 1
+    return n
+
+
+cdef inline unsigned char *_put_varint(unsigned char *p, unsigned long long v):
+    while v >= 0x80:
+        p[0] = <unsigned char>((v & 0x7F) | 0x80)
+        v >>= 7
+        p += 1
+    p[0] = <unsigned char>v
+    return p + 1
+
+
+cdef inline Py_ssize_t _len_field_size(bytes b):
+    cdef Py_ssize_t n = len(b)
+    return 0 if n == 0 else 1 + _varint_size(n) + n
+
+
+cdef inline unsigned char *_put_len_field(unsigned char *p, unsigned char tag, bytes b):
+    cdef Py_ssize_t n = len(b)
+    if n == 0:
+        return p
+    p[0] = tag
+    p = _put_varint(p + 1, n)
+    memcpy(p, PyBytes_AS_STRING(b), n)
+    return p + n
+
+
+cdef inline object _uint(object v, str name):
+    # Same TypeErrors as protobuf: bools and non-integral numbers are rejected
+    if isinstance(v, bool):
+        raise TypeError(f"Field Packet.{name}: Expected an int, got a boolean.")
+    return index(v)
+
+
+cdef inline bytes _utf8(object s):
+    if isinstance(s, str):
+        return (<str>s).encode("utf-8")
+    if isinstance(s, bytes):
+        return <bytes>s
+    raise TypeError(f"expected str or bytes, got {type(s).__name__}")
+
+
+def encode_packet(object typ, object msg_id, object src, object dst, object body,
+                  object fee, object ttl, bytes scar not None):
+    """Return the canonical encoding of an unsigned Packet (fields 3-10).
+
+    Byte-for-byte what keep_pb2.Packet(...).SerializeToString() produces:
+    fields in number order, default values omitted. String fields may be
+    str or UTF-8 bytes.
+    """
+    typ = _uint(typ, "typ")
+    fee = _uint(fee, "fee")
+    ttl = _uint(ttl, "ttl")
+    if not 0 <= typ < (1 << 32):
+        raise ValueError(f"typ out of range for uint32: {typ}")
+    if not 0 <= fee < (1 << 64):
+        raise ValueError(f"fee out of range for uint64: {fee}")
+    if not 0 <= ttl < (1 << 32):
+        raise ValueError(f"ttl out of range for uint32: {ttl}")
+    cdef unsigned long long c_typ = typ
+    cdef unsigned long long c_fee = fee
+    cdef unsigned long long c_ttl = ttl
+    cdef bytes b_id = _utf8(msg_id)
+    cdef bytes b_src = _utf8(src)
+    cdef bytes b_dst = _utf8(dst)
+    cdef bytes b_body = _utf8(body)
+
+    cdef Py_ssize_t size = (
+        _len_field_size(b_id) + _len_field_size(b_src) + _len_field_size(b_dst)
+        + _len_field_size(b_body) + _len_field_size(scar)
+    )
+    if c_typ:
+        size += 1 + _varint_size(c_typ)
+    if c_fee:
+        size += 1 + _varint_size(c_fee)
+    if c_ttl:
+        size += 1 + _varint_size(c_ttl)
+
+    cdef bytes out = PyBytes_FromStringAndSize(NULL, size)
+    cdef unsigned char *p = <unsigned char *>PyBytes_AS_STRING(out)
+    if c_typ:
+        p[0] = 0x18
+        p = _put_varint(p + 1, c_typ)
+    p = _put_len_field(p, 0x22, b_id)
+    p = _put_len_field(p, 0x2a, b_src)
+    p = _put_len_field(p, 0x32, b_dst)
+    p = _put_len_field(p, 0x3a, b_body)
+    if c_fee:
+        p[0] = 0x40
+        p = _put_varint(p + 1, c_fee)
+    if c_ttl:
+        p[0] = 0x48
+        p = _put_varint(p + 1, c_ttl)
+    _put_len_field(p, 0x52, scar)
+    return out
@@ -0,0 +1,369 @@
+"""Keep protocol asyncio client -- sign and send packets over TCP streams."""
+
+import asyncio
+import collections
+import inspect
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+
+from keep import keep_pb2
+from keep.client import (
+    MAX_PACKET_SIZE,
+    _INBOX_MAX,
+    KeepClient,
+    _frame,
+    _frame_len,
+    _is_reply,
+    _is_server_dst,
+    _json_loads,
+    _parse_packet,
+    _parse_received,
+)
+
+# Frames written between drain() calls in send_many()
+_DRAIN_EVERY = 64
+
+
+class AsyncKeepClient:
+    """asyncio client for the keep-protocol server.
+
+    Same wire format, signing, and modes as KeepClient, but I/O runs on
+    asyncio streams so one event loop can drive many connections without a
+    thread per agent.
+
+    Supports two modes:
+      - Ephemeral (default): opens/closes a connection per send() call.
+      - Persistent: await connect() or use `async with` to hold a connection
+        open for sending and receiving routed messages via listen().
+
+    Example:
+        >>> async with AsyncKeepClient(src="bot:alice") as client:
+        ...     await client.send("hello", dst="server", wait_reply=True)
+        ...     await client.listen(lambda p: print(p.src, p.body), timeout=30)
+    """
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 9009,
+        private_key: Optional[Ed25519PrivateKey] = None,
+        timeout: float = 10.0,
+        src: Optional[str] = None,
+        uuid_ids: bool = False,
+    ):
+        # Signing and packet building are shared with the sync client
+        self._signer = KeepClient(
+            host=host,
+            port=port,
+            private_key=private_key,
+            timeout=timeout,
+            src=src,
+            uuid_ids=uuid_ids,
+        )
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.src = self._signer.src
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        # Set by connect(): a dropped connection is reopened on the next send
+        self._persistent = False
+        self._lock = asyncio.Lock()
+        # Packets that arrived while a send waited for replies, for listen()
+        self._inbox: Deque[keep_pb2.Packet] = collections.deque(maxlen=_INBOX_MAX)
+
+    # -- Connection management --
+
+    async def _open(self):
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout
+        )
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            KeepClient._configure_socket(sock)
+        return reader, writer
+
+    async def connect(self) -> None:
+        """Open a persistent connection to the server.
+
+        Until disconnect(), send() reuses this connection, and reopens it on
+        the next call if a failure dropped it.
+        """
+        async with self._lock:
+            self._persistent = True
+            await self._persistent_stream()
+
+    async def disconnect(self) -> None:
+        """Close the persistent connection and return to ephemeral mode."""
+        async with self._lock:
+            self._persistent = False
+            await self._drop_stream()
+
+    async def _drop_stream(self) -> None:
+        """Close the current stream but stay in persistent mode.
+
+        Caller holds self._lock.
+        """
+        if self._writer is not None:
+            writer = self._writer
+            self._reader = self._writer = None
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def _persistent_stream(self) -> bool:
+        """Reopen the persistent stream if it was dropped.
+
+        Returns False in ephemeral mode. Caller holds self._lock.
+        """
+        if self._writer is None and self._persistent:
+            self._reader, self._writer = await self._open()
+        return self._writer is not None
+
+    async def __aenter__(self) -> "AsyncKeepClient":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.disconnect()
+
+    # -- Framing helpers --
+
+    @staticmethod
+    async def _read_frame(reader: asyncio.StreamReader) -> bytes:
+        """Read a length-prefixed frame: 4-byte BE header + payload."""
+        try:
+            msg_len = _frame_len(await reader.readexactly(4))
+            return await reader.readexactly(msg_len)
+        except asyncio.IncompleteReadError as e:
+            raise ConnectionError(
+                f"Connection closed: expected {e.expected} bytes, got {len(e.partial)}"
+            ) from e
+
+    @classmethod
+    async def _read_packet(cls, reader: asyncio.StreamReader) -> keep_pb2.Packet:
+        """Read and parse one framed Packet from reader."""
+        return _parse_packet(await cls._read_frame(reader))
+
+    @staticmethod
+    def _framed(wire_data: bytes) -> bytes:
+        if len(wire_data) > MAX_PACKET_SIZE:
+            raise ValueError(f"Packet too large: {len(wire_data)} > {MAX_PACKET_SIZE}")
+        return _frame(wire_data)
+
+    # -- Send --
+
+    async def send(
+        self,
+        body: str,
+        src: Optional[str] = None,
+        dst: str = "server",
+        typ: int = 0,
+        fee: int = 0,
+        ttl: int = 60,
+        msg_id: Optional[str] = None,
+        scar: bytes = b"",
+        wait_reply: Optional[bool] = None,
+    ) -> Optional[keep_pb2.Packet]:
+        """Sign and send a packet.
+
+        Reply semantics match KeepClient.send(): ephemeral mode always
+        returns the server's reply; persistent mode waits according to
+        wait_reply (default: wait for "server", "" and "discover:*"),
+        return the reply by id (or a routed packet's answer from dst), and
+        keep other packets that arrive meanwhile for the next listen().
+        """
+        cache_sig = bool(msg_id)
+        msg_id = msg_id or self._signer._new_msg_id()
+        frame = self._framed(self._signer._sign_packet(
+            body=body,
+            src=src,
+            dst=dst,
+            typ=typ,
+            fee=fee,
+            ttl=ttl,
+            msg_id=msg_id,
+            scar=scar,
+            cache_sig=cache_sig,
+        ))
+
+        async with self._lock:
+            if await self._persistent_stream():
+                try:
+                    self._writer.write(frame)
+                    await self._writer.drain()
+
+                    should_wait = wait_reply
+                    if should_wait is None:
+                        should_wait = _is_server_dst(dst)
+
+                    if should_wait:
+                        while True:
+                            p = _parse_received(await asyncio.wait_for(
+                                self._read_frame(self._reader), self.timeout
+                            ))
+                            if p is None:
+                                continue
+                            if _is_reply(p, msg_id, dst):
+                                return p
+                            self._inbox.append(p)
+                    return None
+                except (OSError, asyncio.TimeoutError):
+                    await self._drop_stream()
+                    raise
+
+        # Ephemeral mode — open/close per call
+        reader, writer = await self._open()
+        try:
+            writer.write(frame)
+            await writer.drain()
+            return await asyncio.wait_for(self._read_packet(reader), self.timeout)
+        finally:
+            writer.close()
+
+    async def send_many(
+        self,
+        packets: Iterable[Tuple[str, str]],
+        src: Optional[str] = None,
+    ) -> List[Optional[keep_pb2.Packet]]:
+        """Pipeline several packets on the persistent connection.
+
+        Every packet is signed up front, then frames are written back-to-back
+        while a concurrent reader collects replies, so a batch of requests
+        costs about one round trip instead of one per packet. Replies are
+        matched to requests by id, which the server echoes.
+
+        Args:
+            packets: (dst, body) pairs, sent in order.
+            src: Sender identity for every packet (default: self.src).
+
+        Returns:
+            One entry per packet, in order: the server's reply for packets to
+            "server", "" and "discover:*", None for packets routed to agents.
+            Other packets that arrive during the batch are kept for the next
+            listen().
+
+        Raises:
+            RuntimeError: If not connected (call connect() first).
+            ValueError: If any signed packet exceeds MAX_PACKET_SIZE.
+        """
+        if not self._persistent:
+            raise RuntimeError("Not connected. Call connect() first.")
+
+        frames = []
+        pending: Dict[str, int] = {}
+        for i, (dst, body) in enumerate(packets):
+            msg_id = self._signer._new_msg_id()
+            frames.append(self._framed(self._signer._sign_packet(
+                body=body, src=src, dst=dst, msg_id=msg_id, cache_sig=False
+            )))
+            if _is_server_dst(dst):
+                pending[msg_id] = i
+        replies: List[Optional[keep_pb2.Packet]] = [None] * len(frames)
+        if not frames:
+            return replies
+
+        async def write_frames():
+            for n, frame in enumerate(frames, 1):
+                self._writer.write(frame)
+                if n % _DRAIN_EVERY == 0:
+                    await self._writer.drain()
+            await self._writer.drain()
+
+        async def read_replies():
+            while pending:
+                p = _parse_received(await asyncio.wait_for(
+                    self._read_frame(self._reader), self.timeout
+                ))
+                if p is None:
+                    continue
+                i = pending.pop(p.id, None)
+                if i is not None:
+                    replies[i] = p
+                else:
+                    self._inbox.append(p)
+
+        async with self._lock:
+            if not await self._persistent_stream():
+                raise RuntimeError("Not connected. Call connect() first.")
+            writing = asyncio.ensure_future(write_frames())
+            reading = asyncio.ensure_future(read_replies())
+            try:
+                await asyncio.gather(writing, reading)
+            except BaseException:
+                # Unread replies leave the stream unusable, including on cancel
+                writing.cancel()
+                reading.cancel()
+                await self._drop_stream()
+                raise
+        return replies
+
+    # -- Listen --
+
+    async def listen(
+        self,
+        callback: Callable[[keep_pb2.Packet], Any],
+        timeout: Optional[float] = None,
+    ) -> None:
+        """Read packets from the persistent connection.
+
+        Invokes callback(packet) for each received packet, starting with
+        those that arrived while a send waited for replies; coroutine
+        callbacks are awaited. Heartbeat packets (typ=2) are silently
+        filtered. A connection that was dropped is reopened first; one that
+        the server closes while listening is dropped, so the next call
+        reconnects.
+
+        Args:
+            callback: Called with each received Packet.
+            timeout: Seconds to listen before returning. None = listen until
+                     the connection closes or an error occurs.
+
+        Raises:
+            RuntimeError: If not connected (call connect() first).
+        """
+        async with self._lock:
+            if not await self._persistent_stream():
+                raise RuntimeError("Not connected. Call connect() first.")
+            reader, writer = self._reader, self._writer
+            pending = list(self._inbox)
+            self._inbox.clear()
+
+        async def deliver(p: keep_pb2.Packet) -> None:
+            result = callback(p)
+            if inspect.isawaitable(result):
+                await result
+
+        for p in pending:
+            await deliver(p)
+
+        async def loop():
+            while True:
+                p = _parse_received(await self._read_frame(reader))
+                if p is not None:
+                    await deliver(p)
+
+        try:
+            await asyncio.wait_for(loop(), timeout)
+        except asyncio.TimeoutError:
+            return
+        except ConnectionError:
+            async with self._lock:
+                if self._writer is writer:
+                    await self._drop_stream()
+            return
+
+    # -- Discovery --
+
+    async def discover(self, query: str = "info") -> dict:
+        """Send a discovery query and return parsed JSON response."""
+        reply = await self.send(body="", dst=f"discover:{query}")
+        return _json_loads(reply.body)
+
+    async def discover_agents(self) -> list:
+        """Return list of currently connected agent identities."""
+        info = await self.discover("agents")
+        return info.get("agents", [])
@@ -4,13 +4,19 @@ Run with: python -m keep.mcp
 Or after install: keep-mcp
 """
 
+import functools
 import json
 import os
-from typing import Optional
+import time
+from typing import TYPE_CHECKING, Optional
 
 from mcp.server.fastmcp import FastMCP
 
-from keep.client import KeepClient
+if TYPE_CHECKING:
+    from keep.client import KeepClient
+
+# keep.client (protobuf, cryptography) is imported on the first tool call,
+# so the stdio server answers the MCP handshake sooner.
 
 # Configuration from environment
 KEEP_HOST = os.environ.get("KEEP_HOST", "localhost")
@@ -20,9 +26,33 @@ KEEP_SRC = os.environ.get("KEEP_SRC", "bot:mcp-agent")
 # Create MCP server
 mcp = FastMCP("keep-protocol")
 
+# How long keep_ensure_server trusts the last sign of a live server (seconds)
+SERVER_UP_TTL = 30.0
+
+# time.monotonic() until which the server is assumed up. Refreshed by a
+# successful probe or tool call, cleared when a connection is refused.
+_server_up_until = 0.0
+
+
+def _mark_server_up() -> None:
+    global _server_up_until
+    _server_up_until = time.monotonic() + SERVER_UP_TTL
+
+
+def _mark_server_down() -> None:
+    global _server_up_until
+    _server_up_until = 0.0
+
+
+@functools.lru_cache(maxsize=1)
+def _get_client() -> "KeepClient":
+    """Return the process-wide KeepClient for the configured host/port/src.
+
+    Built once, so the ed25519 keypair is generated once per process and
+    every tool call signs with the same identity.
+    """
+    from keep.client import KeepClient
 
-def _get_client() -> KeepClient:
-    """Create a KeepClient with configured host/port/src."""
     return KeepClient(host=KEEP_HOST, port=KEEP_PORT, src=KEEP_SRC)
 
 
@@ -50,6 +80,9 @@ def keep_send(
         Response body from the destination, or "done" if server acknowledged.
     """
     client = _get_client()
+    # Encoded per call on purpose: tool arguments arrive as new str objects,
+    # so a cache keyed on them would hash the whole scar on every lookup,
+    # which costs more than encoding ASCII text outright.
     scar_bytes = scar.encode("utf-8") if scar else b""
 
     try:
@@ -60,8 +93,10 @@ def keep_send(
             ttl=ttl,
             scar=scar_bytes,
         )
+        _mark_server_up()
         return reply.body if reply else "sent"
     except ConnectionRefusedError:
+        _mark_server_down()
         return f"error: keep-server not running on {KEEP_HOST}:{KEEP_PORT}"
     except Exception as e:
         return f"error: {str(e)}"
@@ -82,8 +117,10 @@ def keep_discover(query: str = "info") -> str:
 
     try:
         result = client.discover(query)
+        _mark_server_up()
         return json.dumps(result, indent=2)
     except ConnectionRefusedError:
+        _mark_server_down()
         return json.dumps({"error": f"keep-server not running on {KEEP_HOST}:{KEEP_PORT}"})
     except Exception as e:
         return json.dumps({"error": str(e)})
@@ -100,8 +137,10 @@ def keep_discover_agents() -> str:
 
     try:
         agents = client.discover_agents()
+        _mark_server_up()
         return json.dumps(agents)
     except ConnectionRefusedError:
+        _mark_server_down()
         return json.dumps({"error": f"keep-server not running on {KEEP_HOST}:{KEEP_PORT}"})
     except Exception as e:
         return json.dumps({"error": str(e)})
@@ -121,6 +160,8 @@ def keep_listen(timeout: int = 10, register_src: Optional[str] = None) -> str:
     Returns:
         JSON object with received messages: {"messages": [...], "count": N}
     """
+    from keep.client import KeepClient
+
     src = register_src or KEEP_SRC
     messages = []
 
@@ -140,6 +181,7 @@ def keep_listen(timeout: int = 10, register_src: Optional[str] = None) -> str:
 
         return json.dumps({"messages": messages, "count": len(messages)})
     except ConnectionRefusedError:
+        _mark_server_down()
         return json.dumps({"error": f"keep-server not running on {KEEP_HOST}:{KEEP_PORT}"})
     except Exception as e:
         return json.dumps({"error": str(e)})
@@ -156,14 +198,23 @@ def keep_ensure_server() -> str:
     Returns:
         JSON object: {"running": true/false, "method": "existing"|"docker"|"go"|"failed"}
     """
+    # Agents often call this before every other tool; skip the TCP probe
+    # while a recent probe or tool call showed the server up.
+    if time.monotonic() < _server_up_until:
+        return json.dumps({"running": True, "method": "existing"})
+
+    from keep.client import KeepClient
+
     # Check if already running
     if KeepClient._is_port_open(KEEP_HOST, KEEP_PORT):
+        _mark_server_up()
         return json.dumps({"running": True, "method": "existing"})
 
     # Try to start
     success = KeepClient.ensure_server(host=KEEP_HOST, port=KEEP_PORT)
 
     if success:
+        _mark_server_up()
         # Determine which method worked
         method = "docker" if KeepClient._has_docker() else "go"
         return json.dumps({"running": True, "method": method})
@@ -0,0 +1,22 @@
+"""Build hook for the optional keep._fast extension.
+
+Project metadata lives in pyproject.toml. When Cython is importable at
+build time (e.g. `pip install Cython && pip install --no-build-isolation ./python`),
+the framing and packet-encoding helpers in keep/_fast.pyx are compiled.
+Otherwise, or if the compiler is unavailable, the package installs as pure
+Python.
+"""
+
+from setuptools import Extension, setup
+
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    ext_modules = []
+else:
+    ext_modules = cythonize(
+        [Extension("keep._fast", ["keep/_fast.pyx"], optional=True)],
+        language_level=3,
+    )
+
+setup(ext_modules=ext_modules)
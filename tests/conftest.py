@@ -0,0 +1,48 @@
+"""Shared helpers for the server-free SDK tests."""
+
+import socket
+import sys
+from pathlib import Path
+
+import pytest
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey
+
+# Add the Python SDK to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "python"))
+
+from keep import keep_pb2
+from keep.client import KeepClient
+
+
+def server_verify(wire: bytes) -> keep_pb2.Packet:
+    """Parse wire bytes and verify the signature like keep.go's verifySig."""
+    p = keep_pb2.Packet()
+    p.ParseFromString(wire)
+    sign_copy = keep_pb2.Packet()
+    sign_copy.CopyFrom(p)
+    sign_copy.ClearField("sig")
+    sign_copy.ClearField("pk")
+    Ed25519PublicKey.from_public_bytes(p.pk).verify(p.sig, sign_copy.SerializeToString())
+    return p
+
+
+@pytest.fixture
+def paired_client():
+    """Factory for a connected KeepClient whose server end is a local socket.
+
+    Call it with KeepClient keyword arguments; it returns (client, peer).
+    Clients are disconnected and peers closed when the test ends.
+    """
+    opened = []
+
+    def make(**kwargs):
+        client = KeepClient(**kwargs)
+        client._sock, peer = socket.socketpair()
+        client._persistent = True
+        opened.append((client, peer))
+        return client, peer
+
+    yield make
+    for client, peer in opened:
+        client.disconnect()
+        peer.close()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""Tests for AsyncKeepClient against an in-process asyncio server.
+
+The fake server verifies signatures like keep.go and replies "done" to
+packets addressed to the server, echoing the request id.
+
+Usage:
+    pytest tests/test_aclient.py -v
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add the Python SDK to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "python"))
+
+from conftest import server_verify
+from keep import keep_pb2
+from keep.aclient import AsyncKeepClient
+
+
+async def fake_server(received: list, extra_before_reply: bytes = b"", drop_first: bool = False):
+    """Start a server that records verified packets and replies "done".
+
+    With drop_first, the first connection is closed after its first packet.
+    """
+    connections = []
+
+    async def handle(reader, writer):
+        connections.append(writer)
+        try:
+            while True:
+                p = server_verify(await AsyncKeepClient._read_frame(reader))
+                received.append(p)
+                if drop_first and len(connections) == 1:
+                    writer.close()
+                    return
+                if p.dst in ("server", ""):
+                    reply = keep_pb2.Packet(id=p.id, typ=1, src="server", body="done")
+                    writer.write(extra_before_reply + frame_packet(reply))
+                    await writer.drain()
+        except ConnectionError:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1]
+
+
+def frame_packet(p: keep_pb2.Packet) -> bytes:
+    """Frame a Packet the way the server writes it."""
+    data = p.SerializeToString()
+    return len(data).to_bytes(4, "big") + data
+
+
+class TestAsyncSend:
+    """Tests for AsyncKeepClient.send()."""
+
+    def test_ephemeral_send(self):
+        """Ephemeral send returns the server's reply."""
+        async def run():
+            received = []
+            server, port = await fake_server(received)
+            async with server:
+                reply = await AsyncKeepClient("127.0.0.1", port, src="bot:a").send("hi")
+            return reply, received
+
+        reply, received = asyncio.run(run())
+
+        assert reply.body == "done"
+        assert reply.id == received[0].id
+        assert received[0].src == "bot:a"
+
+    def test_persistent_send_skips_heartbeat(self):
+        """Persistent send ignores a heartbeat that precedes the reply."""
+        heartbeat = frame_packet(keep_pb2.Packet(typ=2, src="server"))
+
+        async def run():
+            received = []
+            server, port = await fake_server(received, extra_before_reply=heartbeat)
+            async with server:
+                async with AsyncKeepClient("127.0.0.1", port) as client:
+                    first = await client.send("one")
+                    second = await client.send("two")
+            return first, second, received
+
+        first, second, received = asyncio.run(run())
+
+        assert (first.body, second.body) == ("done", "done")
+        assert [p.body for p in received] == ["one", "two"]
+
+    def test_persistent_send_keeps_stale_reply(self):
+        """A late reply to another packet is kept for listen(), not returned."""
+        stale = frame_packet(keep_pb2.Packet(id="other-1", typ=1, src="server", body="error:offline"))
+
+        async def run():
+            received = []
+            listened = []
+            server, port = await fake_server(received, extra_before_reply=stale)
+            async with server:
+                async with AsyncKeepClient("127.0.0.1", port) as client:
+                    reply = await client.send("one")
+                    await client.listen(listened.append, timeout=0.1)
+            return reply, received, listened
+
+        reply, received, listened = asyncio.run(run())
+
+        assert (reply.id, reply.body) == (received[0].id, "done")
+        assert [p.id for p in listened] == ["other-1"]
+
+    def test_reconnects_after_failure(self):
+        """A failed exchange drops the connection; queued sends reopen it."""
+        async def run():
+            received = []
+            server, port = await fake_server(received, drop_first=True)
+            async with server:
+                async with AsyncKeepClient("127.0.0.1", port) as client:
+                    results = await asyncio.gather(
+                        client.send("one"), client.send("two"), return_exceptions=True
+                    )
+                    still_connected = client._writer is not None
+            return results, still_connected
+
+        (first, second), still_connected = asyncio.run(run())
+
+        assert isinstance(first, ConnectionError)
+        assert second.body == "done"
+        assert still_connected
+
+    def test_send_many_matches_replies(self):
+        """Pipelined replies line up with their requests; routed packets get None."""
+        heartbeat = frame_packet(keep_pb2.Packet(typ=2, src="server"))
+        batch = [("server", f"m{i}") for i in range(200)] + [("bot:b", "routed")]
+
+        async def run():
+            received = []
+            server, port = await fake_server(received, extra_before_reply=heartbeat)
+            async with server:
+                async with AsyncKeepClient("127.0.0.1", port) as client:
+                    replies = await client.send_many(batch)
+            return replies, received
+
+        replies, received = asyncio.run(run())
+
+        assert [p.body for p in received] == [body for _, body in batch]
+        assert [r.id for r in replies[:-1]] == [p.id for p in received[:-1]]
+        assert replies[-1] is None
+
+    def test_send_many_requires_connection(self):
+        """send_many() needs a persistent connection."""
+        with pytest.raises(RuntimeError):
+            asyncio.run(AsyncKeepClient().send_many([("server", "hi")]))
+
+    def test_listen_requires_connection(self):
+        """listen() needs a persistent connection."""
+        with pytest.raises(RuntimeError):
+            asyncio.run(AsyncKeepClient().listen(print, timeout=0.1))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,626 @@
+#!/usr/bin/env python3
+"""Tests for KeepClient packet signing, framing, and connection reuse.
+
+These run without a server: packets are checked the way the Go server
+checks them, and framing is exercised over a local socketpair.
+
+Usage:
+    pytest tests/test_client_wire.py -v
+"""
+
+import socket
+import struct
+import sys
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+# Add the Python SDK to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "python"))
+
+from conftest import server_verify
+from keep import client as client_module
+from keep import keep_pb2
+from keep.client import MAX_PACKET_SIZE, KeepClient
+
+
+class TestSignPacket:
+    """Tests for _sign_packet wire output."""
+
+    def test_signature_verifies(self):
+        """Signed bytes match the server's re-serialization of the Packet."""
+        client = KeepClient(src="bot:test")
+        wire = client._sign_packet(
+            body="hello", dst="bot:other", fee=5, ttl=30, msg_id="m-1", scar=b"\x00\x01"
+        )
+
+        p = server_verify(wire)
+
+        assert p.src == "bot:test"
+        assert p.dst == "bot:other"
+        assert p.body == "hello"
+        assert p.id == "m-1"
+        assert p.fee == 5
+        assert p.ttl == 30
+        assert p.scar == b"\x00\x01"
+        assert p.pk == client._pk_bytes
+        assert len(p.sig) == 64
+
+    def test_default_fields_verify(self):
+        """Packets with all-default optional fields still verify."""
+        client = KeepClient()
+        p = server_verify(client._sign_packet(body="", ttl=0))
+
+        assert p.body == ""
+        assert p.src == "bot:keep-client"
+
+    def test_src_override_is_per_packet(self):
+        """An explicit src applies to that packet only."""
+        client = KeepClient(src="bot:default")
+
+        first = server_verify(client._sign_packet(body="a", src="bot:other"))
+        second = server_verify(client._sign_packet(body="b"))
+
+        assert first.src == "bot:other"
+        assert second.src == "bot:default"
+
+    def test_fields_do_not_leak_between_packets(self):
+        """Optional fields from one packet are not carried into the next."""
+        client = KeepClient()
+
+        client._sign_packet(body="a", fee=9, scar=b"scar", typ=1)
+        p = server_verify(client._sign_packet(body="b"))
+
+        assert p.fee == 0
+        assert p.scar == b""
+        assert p.typ == 0
+
+    @pytest.mark.parametrize("fee,ttl,scar", [(0, 0, b""), (5, 60, b"s"), (1 << 40, 300, b"x" * 200)])
+    def test_bytes_body_matches_str_body(self, fee, ttl, scar):
+        """A pre-encoded body produces the same signed bytes as the str form."""
+        client = KeepClient()
+        body = '{"msg": "h\u00e9llo"}' + "x" * 200
+        kwargs = dict(dst="bot:a", fee=fee, ttl=ttl, msg_id="m-1", scar=scar)
+
+        as_str = client._sign_packet(body=body, **kwargs)
+        as_bytes = client._sign_packet(body=body.encode("utf-8"), **kwargs)
+
+        assert as_bytes == as_str
+        assert server_verify(as_bytes).body == body
+
+    def test_bytes_body_rejects_bad_ttl(self):
+        """Out-of-range integers are rejected like protobuf would."""
+        with pytest.raises(ValueError):
+            KeepClient()._sign_packet(body=b"x", ttl=-1)
+
+    def test_generated_ids_are_unique(self):
+        """Generated ids share the client's prefix and never repeat."""
+        client = KeepClient()
+
+        ids = [server_verify(client._sign_packet(body="x")).id for _ in range(3)]
+
+        assert len(set(ids)) == 3
+        assert all(i.startswith(client._id_prefix + "-") for i in ids)
+
+    def test_uuid_ids_opt_in(self):
+        """uuid_ids=True produces RFC 4122 UUID strings."""
+        import uuid
+
+        msg_id = server_verify(KeepClient(uuid_ids=True)._sign_packet(body="x")).id
+
+        assert uuid.UUID(msg_id).version == 4
+
+    def test_tampered_body_fails(self):
+        """Changing a signed field invalidates the signature."""
+        client = KeepClient()
+        p = keep_pb2.Packet()
+        p.ParseFromString(client._sign_packet(body="hello"))
+        p.body = "goodbye"
+
+        with pytest.raises(Exception):
+            server_verify(p.SerializeToString())
+
+
+class TestFastEncoder:
+    """Tests for the compiled encoder in keep._fast (skipped when not built)."""
+
+    @pytest.mark.parametrize("fields", [
+        dict(),
+        dict(typ=2, id="heartbeat:bot:a", src="bot:a", dst="server"),
+        dict(typ=1, id="m-1", src="bot:a", dst="bot:b", body="h\u00e9llo" * 50,
+             fee=1 << 40, ttl=300, scar=b"\x00" * 200),
+        dict(typ=(1 << 32) - 1, fee=(1 << 64) - 1, ttl=(1 << 32) - 1),
+    ])
+    def test_matches_protobuf(self, fields):
+        """encode_packet() reproduces protobuf's serialization byte for byte."""
+        fast = pytest.importorskip("keep._fast")
+        args = dict(typ=0, id="", src="", dst="", body="", fee=0, ttl=0, scar=b"")
+        args.update(fields)
+
+        encoded = fast.encode_packet(*args.values())
+
+        assert encoded == keep_pb2.Packet(**args).SerializeToString()
+
+    def test_rejects_out_of_range(self):
+        """Out-of-range integers raise ValueError like protobuf does."""
+        fast = pytest.importorskip("keep._fast")
+
+        with pytest.raises(ValueError):
+            fast.encode_packet(0, "m", "s", "d", "b", 0, -1, b"")
+
+    @pytest.mark.parametrize("field,value", [
+        ("typ", True), ("typ", 1.0), ("fee", 2.0), ("ttl", 3.5), ("ttl", "1"), ("typ", -1),
+    ])
+    def test_errors_match_protobuf(self, field, value):
+        """Invalid integers raise the same exception type as protobuf."""
+        fast = pytest.importorskip("keep._fast")
+        args = dict(typ=0, id="m", src="s", dst="d", body="b", fee=0, ttl=0, scar=b"")
+        args[field] = value
+
+        with pytest.raises(Exception) as expected:
+            keep_pb2.Packet(**args)
+        with pytest.raises(expected.type):
+            fast.encode_packet(*args.values())
+
+
+class TestSigner:
+    """Tests for the ed25519 signing backend."""
+
+    def test_matches_cryptography(self):
+        """The active backend signs exactly like cryptography's Ed25519."""
+        client = KeepClient()
+
+        assert client._sign(b"payload") == client._private_key.sign(b"payload")
+
+    def test_cryptography_fallback(self):
+        """Without PyNaCl, signing uses the cryptography key directly."""
+        client = KeepClient()
+
+        with patch.object(client_module, "crypto_sign", None):
+            sign = KeepClient._make_signer(client._private_key)
+
+        assert sign(b"payload") == client._private_key.sign(b"payload")
+
+
+class TestVerifyMany:
+    """Tests for verify_many() on received packets."""
+
+    def packets(self):
+        sender = KeepClient(src="bot:sender")
+        other = KeepClient(src="bot:other")
+        good = [keep_pb2.Packet.FromString(c._sign_packet(body=f"m{i}", dst="bot:me", scar=b"s"))
+                for i, c in enumerate([sender, other, sender])]
+        tampered = keep_pb2.Packet()
+        tampered.CopyFrom(good[0])
+        tampered.body = "changed"
+        unsigned = keep_pb2.Packet(src="bot:x", body="hi")
+        return good + [tampered, unsigned]
+
+    def test_results_per_packet(self):
+        """Valid packets pass; tampered and unsigned ones fail."""
+        assert KeepClient.verify_many(self.packets()) == [True, True, True, False, False]
+
+    def test_cryptography_fallback(self):
+        """Without PyNaCl, verification gives the same answers."""
+        packets = self.packets()
+
+        with patch.object(client_module, "crypto_sign_open", None):
+            assert KeepClient.verify_many(packets) == [True, True, True, False, False]
+
+
+class TrickleSocket:
+    """Socket stand-in that returns at most `step` bytes per read."""
+
+    def __init__(self, data: bytes, step: int):
+        self.data = data
+        self.step = step
+        self.reads = 0
+
+    def recv(self, n):
+        self.reads += 1
+        chunk, self.data = self.data[:min(n, self.step)], self.data[min(n, self.step):]
+        return chunk
+
+    def recv_into(self, view, n):
+        chunk = self.recv(n)
+        view[:len(chunk)] = chunk
+        return len(chunk)
+
+
+class TestFraming:
+    """Tests for the length-prefixed framing helpers."""
+
+    def setup_method(self):
+        self.a, self.b = socket.socketpair()
+
+    def teardown_method(self):
+        self.a.close()
+        self.b.close()
+
+    def test_round_trip(self):
+        """A framed payload is read back intact."""
+        KeepClient._send_framed(self.a, b"hello")
+
+        assert KeepClient._recv_framed(self.b) == b"hello"
+
+    def test_header_is_big_endian_length(self):
+        """The frame header is a 4-byte big-endian length."""
+        KeepClient._send_framed(self.a, b"abc")
+
+        assert KeepClient._recv_exact(self.b, 7) == b"\x00\x00\x00\x03abc"
+
+    def test_oversized_send_rejected(self):
+        """Payloads over MAX_PACKET_SIZE are refused before sending."""
+        with pytest.raises(ValueError):
+            KeepClient._send_framed(self.a, b"x" * (MAX_PACKET_SIZE + 1))
+
+    def test_zero_length_frame_rejected(self):
+        """A zero-length header is a protocol error."""
+        self.a.sendall(struct.pack(">I", 0))
+
+        with pytest.raises(ConnectionError):
+            KeepClient._recv_framed(self.b)
+
+    def test_oversized_frame_rejected(self):
+        """A header larger than MAX_PACKET_SIZE is a protocol error."""
+        self.a.sendall(struct.pack(">I", MAX_PACKET_SIZE + 1))
+
+        with pytest.raises(ConnectionError):
+            KeepClient._recv_framed(self.b)
+
+    def test_short_reads_reassembled(self):
+        """A frame delivered in small pieces is read back intact."""
+        payload = bytes(range(256)) * 4
+        sock = TrickleSocket(struct.pack(">I", len(payload)) + payload, step=7)
+
+        assert KeepClient._recv_framed(sock) == payload
+        assert sock.data == b""
+
+    def test_whole_frame_single_read(self):
+        """A frame that arrives at once costs one read per header and payload."""
+        sock = TrickleSocket(struct.pack(">I", 5) + b"hello", step=MAX_PACKET_SIZE)
+
+        assert KeepClient._recv_framed(sock) == b"hello"
+        assert sock.reads == 2
+
+    def test_closed_mid_frame(self):
+        """EOF before the full payload raises ConnectionError."""
+        self.a.sendall(struct.pack(">I", 10) + b"abc")
+        self.a.close()
+
+        with pytest.raises(ConnectionError):
+            KeepClient._recv_framed(self.b)
+
+
+class TestSendMany:
+    """Tests for send_many batching."""
+
+    def test_requires_connection(self):
+        """send_many needs a persistent connection."""
+        with pytest.raises(RuntimeError):
+            KeepClient().send_many([("bot:a", "hi")])
+
+    def test_frames_sent_in_order(self, paired_client):
+        """Each packet arrives as its own signed frame, in order."""
+        client, peer = paired_client(src="bot:batch")
+
+        client.send_many([("bot:a", "one"), ("bot:b", "two"), ("bot:c", "three")])
+        received = [server_verify(KeepClient._recv_framed(peer)) for _ in range(3)]
+
+        assert [(p.dst, p.body) for p in received] == [
+            ("bot:a", "one"),
+            ("bot:b", "two"),
+            ("bot:c", "three"),
+        ]
+        assert all(p.src == "bot:batch" for p in received)
+
+
+class TestPersistentSend:
+    """Tests for send() on a persistent connection."""
+
+    def test_skips_heartbeats_while_waiting(self, paired_client):
+        """A heartbeat that arrives before the reply is not returned."""
+        client, peer = paired_client()
+        KeepClient._send_framed(peer, keep_pb2.Packet(typ=2, src="server").SerializeToString())
+        KeepClient._send_framed(peer, keep_pb2.Packet(id="m-1", typ=1, body="done").SerializeToString())
+
+        reply = client.send("hello", dst="server", msg_id="m-1")
+
+        assert reply.body == "done"
+
+    def test_large_reply_read_whole(self, paired_client):
+        """A 60 KiB reply is returned intact, not cut at a single recv()."""
+        body = "x" * (60 * 1024)
+        client, peer = paired_client()
+        reply_data = keep_pb2.Packet(id="m-1", typ=1, body=body).SerializeToString()
+        # Write from a thread: the frame can exceed the socketpair buffer
+        # (8 KiB on macOS), so sendall() blocks until the client reads.
+        writer = threading.Thread(target=KeepClient._send_framed, args=(peer, reply_data))
+        writer.start()
+
+        reply = client.send("hello", dst="server", msg_id="m-1")
+        writer.join()
+
+        assert reply.body == body
+
+    def test_reply_matched_by_id(self, paired_client):
+        """Late error replies and routed packets are kept for listen(), not returned."""
+        client, peer = paired_client()
+        client.send("fire and forget", dst="bot:gone")
+        sent = server_verify(KeepClient._recv_framed(peer))
+        for p in (
+            keep_pb2.Packet(id=sent.id, typ=1, src="server", body="error:offline"),
+            keep_pb2.Packet(id="x-1", src="bot:b", dst="bot:keep-client", body="hi"),
+            keep_pb2.Packet(id="q-1", typ=1, src="server", body="done"),
+        ):
+            KeepClient._send_framed(peer, p.SerializeToString())
+
+        reply = client.send("query", dst="server", msg_id="q-1")
+        received = []
+        peer.close()
+        client.listen(received.append)
+
+        assert (reply.id, reply.body) == ("q-1", "done")
+        assert [p.body for p in received] == ["error:offline", "hi"]
+
+    def test_routed_reply_returned(self, paired_client):
+        """Waiting on a packet to an agent returns that agent's answer."""
+        client, peer = paired_client()
+        answer = keep_pb2.Packet(id="a-1", src="bot:x", dst="bot:keep-client", body="pong")
+        KeepClient._send_framed(peer, answer.SerializeToString())
+
+        reply = client.send("ping", dst="bot:x", wait_reply=True)
+
+        assert (reply.src, reply.body) == ("bot:x", "pong")
+
+    def test_failed_connection_is_dropped(self, paired_client):
+        """A connection that fails mid-exchange is closed and cleared."""
+        client, peer = paired_client()
+        peer.close()
+
+        with pytest.raises(ConnectionError):
+            client.send("hello", dst="server")
+
+        assert client._sock is None
+
+    def test_reconnects_after_failure(self):
+        """After a failed exchange, the next send opens a fresh connection."""
+        server = socket.create_server(("127.0.0.1", 0))
+        client = KeepClient("127.0.0.1", server.getsockname()[1])
+        try:
+            client.connect()
+            first, _ = server.accept()
+            first.close()
+
+            with pytest.raises(ConnectionError):
+                client.send("lost", dst="bot:a", wait_reply=True)
+
+            client.send("retry", dst="bot:a")
+            second, _ = server.accept()
+            p = server_verify(KeepClient._recv_framed(second))
+            second.close()
+        finally:
+            client.close()
+            server.close()
+
+        assert p.body == "retry"
+        assert client._sock is None
+
+    def test_resends_query_on_stale_connection(self):
+        """A reused connection the server already closed is reopened for a query."""
+        server = socket.create_server(("127.0.0.1", 0))
+        server.settimeout(5.0)
+        client = KeepClient("127.0.0.1", server.getsockname()[1])
+
+        def serve_once():
+            conn, _ = server.accept()
+            with conn:
+                p = server_verify(KeepClient._recv_framed(conn))
+                done = keep_pb2.Packet(id=p.id, typ=1, src="server", body="done")
+                KeepClient._send_framed(conn, done.SerializeToString())
+
+        try:
+            client.connect()
+            first, _ = server.accept()
+            first.close()
+            responder = threading.Thread(target=serve_once)
+            responder.start()
+
+            reply = client.send("ping", dst="server")
+            responder.join()
+        finally:
+            client.close()
+            server.close()
+
+        assert reply.body == "done"
+
+    def test_disconnect_returns_to_ephemeral(self, paired_client):
+        """After disconnect(), send_many no longer has a connection to use."""
+        client, _ = paired_client()
+        client.disconnect()
+
+        with pytest.raises(RuntimeError):
+            client.send_many([("bot:a", "hi")])
+
+
+class TestSignatureReuse:
+    """Tests for the signature cache and heartbeat replay."""
+
+    def test_repeated_payload_signed_once(self):
+        """Identical packets with a caller-chosen id reuse the signature."""
+        client = KeepClient()
+
+        first = client._sign_packet(body="ping", msg_id="fixed")
+        second = client._sign_packet(body="ping", msg_id="fixed")
+
+        assert first == second
+        assert client._sign_cached.cache_info().hits == 1
+        server_verify(second)
+
+    def test_random_ids_bypass_cache(self):
+        """Packets with generated ids never touch the cache."""
+        client = KeepClient()
+
+        client._sign_packet(body="ping")
+        client._sign_packet(body="ping")
+
+        assert client._sign_cached.cache_info().currsize == 0
+
+    def test_heartbeat_replays_wire_bytes(self, paired_client):
+        """send_heartbeat() sends the same signed frame every time."""
+        client, peer = paired_client(src="bot:hb")
+        done = keep_pb2.Packet(id="heartbeat:bot:hb", typ=1, body="done").SerializeToString()
+        KeepClient._send_framed(peer, done)
+        KeepClient._send_framed(peer, done)
+
+        assert client.send_heartbeat().body == "done"
+        assert client.send_heartbeat().body == "done"
+
+        frames = [KeepClient._recv_framed(peer) for _ in range(2)]
+
+        assert frames[0] == frames[1]
+        p = server_verify(frames[0])
+        assert (p.typ, p.src, p.dst) == (2, "bot:hb", "server")
+
+
+class TestListen:
+    """Tests for listen() packet delivery."""
+
+    def test_heartbeats_filtered(self, paired_client):
+        """Server heartbeats never reach the callback; other packets do."""
+        heartbeat = keep_pb2.Packet(typ=2, src="server").SerializeToString()
+        assert heartbeat.startswith(client_module._HEARTBEAT_PREFIX)
+
+        client, peer = paired_client()
+        received = []
+        KeepClient._send_framed(peer, heartbeat)
+        KeepClient._send_framed(peer, keep_pb2.Packet(src="bot:a", body="hi").SerializeToString())
+        peer.close()
+
+        client.listen(received.append)
+
+        assert [(p.src, p.body) for p in received] == [("bot:a", "hi")]
+
+    def test_closed_connection_is_dropped(self, paired_client):
+        """A connection the server closes is dropped, not kept for reuse."""
+        client, peer = paired_client()
+        peer.close()
+
+        client.listen(print, timeout=1.0)
+
+        assert client._sock is None
+
+    def test_reconnects_dropped_connection(self):
+        """listen() reopens a persistent connection that a failure dropped."""
+        server = socket.create_server(("127.0.0.1", 0))
+        server.settimeout(5.0)
+        client = KeepClient("127.0.0.1", server.getsockname()[1])
+        try:
+            client._persistent = True
+            client.listen(print, timeout=0.1)
+            conn, peer_addr = server.accept()
+            conn.close()
+            reopened = client._sock.getsockname()
+        finally:
+            client.close()
+            server.close()
+
+        assert reopened == peer_addr
+
+    def test_packets_safe_to_keep(self, paired_client):
+        """Each callback gets its own Packet, so kept packets stay intact."""
+        client, peer = paired_client()
+        received = []
+        for body in ("one", "two"):
+            KeepClient._send_framed(peer, keep_pb2.Packet(src="bot:a", body=body).SerializeToString())
+        peer.close()
+
+        client.listen(received.append)
+
+        assert received[0] is not received[1]
+        assert [p.body for p in received] == ["one", "two"]
+
+
+class TestResolve:
+    """Tests for cached address resolution."""
+
+    def test_resolves_once(self):
+        """getaddrinfo runs on the first connection only."""
+        client = KeepClient("localhost", 9009)
+        with patch("socket.getaddrinfo", wraps=socket.getaddrinfo) as mock_gai:
+            first = client._resolve()
+            second = client._resolve()
+
+        assert first is second
+        assert mock_gai.call_count == 1
+        assert all(addr[1] == socket.SOCK_STREAM for addr in first)
+        assert all(addr[3][1] == 9009 for addr in first)
+
+    def test_falls_through_to_working_address(self):
+        """A dead address is skipped, and the working one is tried first next time."""
+        server = socket.create_server(("127.0.0.1", 0))
+        port = server.getsockname()[1]
+        dead = socket.create_server(("127.0.0.1", 0))
+        dead_addr = dead.getsockname()
+        dead.close()
+
+        client = KeepClient("127.0.0.1", port)
+        good = (socket.AF_INET, socket.SOCK_STREAM, 0, ("127.0.0.1", port))
+        client._addr = ((socket.AF_INET, socket.SOCK_STREAM, 0, dead_addr), good)
+        try:
+            client._open_socket().close()
+        finally:
+            server.close()
+
+        assert client._addr[0] == good
+
+    def test_failed_lookup_is_dropped(self):
+        """When no address answers, the next connection resolves again."""
+        dead = socket.create_server(("127.0.0.1", 0))
+        port = dead.getsockname()[1]
+        dead.close()
+        client = KeepClient("127.0.0.1", port)
+
+        with pytest.raises(ConnectionRefusedError):
+            client._open_socket()
+
+        assert client._addr is None
+
+
+class TestGetPooled:
+    """Tests for the shared client pool."""
+
+    def setup_method(self):
+        client_module._POOL.clear()
+
+    def teardown_method(self):
+        client_module._POOL.clear()
+
+    def test_reuses_client_per_key(self):
+        """The same (host, port, src) returns the same connected client."""
+        with patch.object(KeepClient, "connect") as mock_connect, \
+             patch("atexit.register") as mock_register:
+            first = KeepClient.get_pooled("localhost", 9009, src="bot:a")
+            second = KeepClient.get_pooled("localhost", 9009, src="bot:a")
+            other = KeepClient.get_pooled("localhost", 9009, src="bot:b")
+
+        assert first is second
+        assert other is not first
+        assert mock_connect.call_count == 2
+        assert mock_register.call_count == 2
+
+    def test_disconnected_client_restored(self):
+        """A pooled client someone disconnected is persistent again on lookup."""
+        with patch.object(KeepClient, "connect"), patch("atexit.register"):
+            client = KeepClient.get_pooled("localhost", 9009, src="bot:a")
+            client.disconnect()
+            again = KeepClient.get_pooled("localhost", 9009, src="bot:a")
+
+        assert again is client
+        assert client._persistent
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
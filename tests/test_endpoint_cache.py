@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Tests for endpoint caching (cache_endpoint / from_cache).
+
+HOME is redirected to a temp directory, and discovery is mocked, so no
+server is needed.
+
+Usage:
+    pytest tests/test_endpoint_cache.py -v
+"""
+
+import json
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+# Add the Python SDK to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "python"))
+
+from keep.client import KeepClient
+
+INFO = {"version": "0.5.0", "agents_online": 1}
+
+
+@pytest.fixture(autouse=True)
+def home(tmp_path, monkeypatch):
+    """Point ~ at a temp dir and reset the in-memory cache state."""
+    monkeypatch.setattr(Path, "home", lambda: tmp_path)
+    monkeypatch.setattr(KeepClient, "_cache_endpoints", None)
+    monkeypatch.setattr(KeepClient, "_cache_key", None)
+    monkeypatch.setattr(KeepClient, "_preferred_endpoint", None)
+    return tmp_path
+
+
+def read_cache(home: Path) -> list:
+    return json.loads((home / ".keep" / "endpoints.json").read_text())["endpoints"]
+
+
+class TestCacheEndpoint:
+    """Tests for cache_endpoint()."""
+
+    def test_writes_and_updates_entries(self, home):
+        """New endpoints are appended; known ones are updated in place."""
+        KeepClient.cache_endpoint("a", 1, INFO)
+        KeepClient.cache_endpoint("b", 2, INFO)
+        KeepClient.cache_endpoint("a", 1, {"version": "0.6.0"})
+
+        endpoints = read_cache(home)
+
+        assert [(ep["host"], ep["port"]) for ep in endpoints] == [("a", 1), ("b", 2)]
+        assert endpoints[0]["version"] == "0.6.0"
+
+    def test_no_temp_files_left(self, home):
+        """The atomic rewrite leaves only endpoints.json behind."""
+        KeepClient.cache_endpoint("a", 1, INFO)
+
+        assert [p.name for p in (home / ".keep").iterdir()] == ["endpoints.json"]
+
+    def test_picks_up_external_changes(self, home):
+        """A file rewritten by another process is re-read."""
+        KeepClient.cache_endpoint("a", 1, INFO)
+        (home / ".keep" / "endpoints.json").write_text(
+            json.dumps({"endpoints": [{"host": "z", "port": 9, "other": True}]})
+        )
+
+        KeepClient.cache_endpoint("a", 1, INFO)
+
+        assert [(ep["host"], ep["port"]) for ep in read_cache(home)] == [("z", 9), ("a", 1)]
+
+    def test_corrupt_file_is_replaced(self, home):
+        """An unreadable cache is overwritten rather than raising."""
+        (home / ".keep").mkdir()
+        (home / ".keep" / "endpoints.json").write_text("{not json")
+
+        KeepClient.cache_endpoint("a", 1, INFO)
+
+        assert [ep["host"] for ep in read_cache(home)] == ["a"]
+
+
+class TestFromCache:
+    """Tests for from_cache()."""
+
+    def test_missing_cache(self):
+        """No cache file raises ConnectionError."""
+        with pytest.raises(ConnectionError):
+            KeepClient.from_cache()
+
+    def test_prefers_last_reachable_endpoint(self):
+        """The endpoint that worked last time is tried first."""
+        KeepClient.cache_endpoint("a", 1, INFO)
+        KeepClient.cache_endpoint("b", 2, INFO)
+        tried = []
+
+        def discover(self, query="info"):
+            tried.append(self.host)
+            if self.host == "a":
+                raise ConnectionRefusedError()
+            return INFO
+
+        with patch.object(KeepClient, "discover", discover):
+            assert KeepClient.from_cache().host == "b"
+            assert KeepClient.from_cache().host == "b"
+
+        assert tried == ["a", "b", "b"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -16,6 +16,7 @@ import json
 import os
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Add the Python SDK to path
@@ -26,165 +27,111 @@ from keep.client import KeepClient
 # Test configuration
 HOST = os.environ.get("KEEP_HOST", "localhost")
 PORT = int(os.environ.get("KEEP_PORT", "9009"))
+# Wall-clock budget for all 7 sections; exceeding it fails the run
+MAX_SECONDS = float(os.environ.get("KP10_MAX_SECONDS", "5"))
 
 PASS = "\033[92m✓ PASS\033[0m"
 FAIL = "\033[91m✗ FAIL\033[0m"
 SKIP = "\033[93m- SKIP\033[0m"
 
+SECTION_TITLES = {
+    1: "discover:info - Server metadata",
+    2: "discover:agents - Connected agents list",
+    3: "discover:stats - Scar/barter statistics",
+    4: "Endpoint caching - ~/.keep/endpoints.json",
+    5: "from_cache() - Client reconnection",
+    6: "Scar logging - Verify scar packets tracked",
+    7: "Error handling - Unknown discovery type",
+}
+
+
+class Section:
+    """Collects one section's check results so sections can run in threads
+    and still print in order."""
+
+    def __init__(self, num: int):
+        self.num = num
+        self.lines = []
+        self.passed = 0
+        self.failed = 0
+
+    def check(self, name: str, condition: bool, detail: str = "") -> bool:
+        self.lines.append(f"  {PASS if condition else FAIL} {name}")
+        if detail:
+            self.lines.append(f"        {detail}")
+        if condition:
+            self.passed += 1
+        else:
+            self.failed += 1
+        return condition
 
-def section(num: int, title: str):
-    print(f"\n{'='*60}")
-    print(f"Section {num}: {title}")
-    print(f"{'='*60}")
-
-
-def test(name: str, condition: bool, detail: str = ""):
-    status = PASS if condition else FAIL
-    print(f"  {status} {name}")
-    if detail:
-        print(f"        {detail}")
-    return condition
-
-
-def main():
-    results = {"passed": 0, "failed": 0, "skipped": 0}
-
-    print(f"\nKP-10: Testing KP-7 Discovery Features")
-    print(f"Target: {HOST}:{PORT}")
-    print(f"{'='*60}")
-
-    # Verify server connectivity first
-    try:
-        client = KeepClient(HOST, PORT, timeout=5.0)
-        reply = client.send(body="ping", dst="server")
-        if reply.body != "done":
-            print(f"\n{FAIL} Server not responding correctly (got: {reply.body})")
-            return 1
-    except Exception as e:
-        print(f"\n{FAIL} Cannot connect to server at {HOST}:{PORT}")
-        print(f"    Error: {e}")
-        print(f"\nStart server first:")
-        print(f"    go build -o keep . && ./keep")
-        print(f"    OR")
-        print(f"    docker build -t keep-server . && docker run -p 9009:9009 keep-server")
-        return 1
+    def error(self, message: str, failed: int):
+        self.lines.append(f"  {FAIL} {message}")
+        self.failed += failed
 
-    print(f"{PASS} Server connection verified\n")
+    def print(self):
+        print(f"\n{'='*60}")
+        print(f"Section {self.num}: {SECTION_TITLES[self.num]}")
+        print(f"{'='*60}")
+        for line in self.lines:
+            print(line)
 
-    # ============================================================
-    # Section 1: discover:info
-    # ============================================================
-    section(1, "discover:info - Server metadata")
 
+def section_info(client: KeepClient) -> Section:
+    sec = Section(1)
     try:
         info = client.discover("info")
 
-        if test("Returns dict", isinstance(info, dict)):
-            results["passed"] += 1
-        else:
-            results["failed"] += 1
-
-        if test("Contains 'version'", "version" in info, f"version={info.get('version')}"):
-            results["passed"] += 1
-        else:
-            results["failed"] += 1
-
-        if test("Version is '0.3.0'", info.get("version") == "0.3.0"):
-            results["passed"] += 1
-        else:
-            results["failed"] += 1
-
-        if test("Contains 'agents_online'", "agents_online" in info, f"agents_online={info.get('agents_online')}"):
-            results["passed"] += 1
-        else:
-            results["failed"] += 1
-
-        if test("Contains 'uptime_sec'", "uptime_sec" in info, f"uptime_sec={info.get('uptime_sec')}"):
-            results["passed"] += 1
-        else:
-            results["failed"] += 1
-
-        if test("uptime_sec is integer >= 0", isinstance(info.get("uptime_sec"), int) and info.get("uptime_sec") >= 0):
-            results["passed"] += 1
-        else:
-            results["failed"] += 1
+        sec.check("Returns dict", isinstance(info, dict))
+        sec.check("Contains 'version'", "version" in info, f"version={info.get('version')}")
+        sec.check("Version is '0.3.0'", info.get("version") == "0.3.0")
+        sec.check("Contains 'agents_online'", "agents_online" in info, f"agents_online={info.get('agents_online')}")
+        sec.check("Contains 'uptime_sec'", "uptime_sec" in info, f"uptime_sec={info.get('uptime_sec')}")
+        sec.check("uptime_sec is integer >= 0",
+                  isinstance(info.get("uptime_sec"), int) and info.get("uptime_sec") >= 0)
 
     except Exception as e:
-        print(f"  {FAIL} discover:info raised exception: {e}")
-        results["failed"] += 6
+        sec.error(f"discover:info raised exception: {e}", 6)
+    return sec
 
-    # ============================================================
-    # Section 2: discover:agents - Connected agents list
-    # ============================================================
-    section(2, "discover:agents - Connected agents list")
 
+def section_agents(client: KeepClient) -> Section:
+    sec = Section(2)
     try:
         agents_response = client.discover("agents")
 
-        if test("Returns dict", isinstance(agents_response, dict)):
-            results["passed"] += 1
-        else:
-            results["failed"] += 1
-
-        if test("Contains 'agents' key", "agents" in agents_response):
-            results["passed"] += 1
-        else:
-            results["failed"] += 1
-
+        sec.check("Returns dict", isinstance(agents_response, dict))
+        sec.check("Contains 'agents' key", "agents" in agents_response)
         agents_list = agents_response.get("agents", [])
-        if test("'agents' is a list", isinstance(agents_list, list), f"agents={agents_list}"):
-            results["passed"] += 1
-        else:
-            results["failed"] += 1
+        sec.check("'agents' is a list", isinstance(agents_list, list), f"agents={agents_list}")
 
         # Test discover_agents() helper
         agents_via_helper = client.discover_agents()
-        if test("discover_agents() returns list", isinstance(agents_via_helper, list)):
-            results["passed"] += 1
-        else:
-            results["failed"] += 1
+        sec.check("discover_agents() returns list", isinstance(agents_via_helper, list))
 
     except Exception as e:
-        print(f"  {FAIL} discover:agents raised exception: {e}")
-        results["failed"] += 4
+        sec.error(f"discover:agents raised exception: {e}", 4)
+    return sec
 
-    # ============================================================
-    # Section 3: discover:stats - Scar/barter statistics
-    # ============================================================
-    section(3, "discover:stats - Scar/barter statistics")
 
+def section_stats(client: KeepClient) -> Section:
+    sec = Section(3)
     try:
         stats = client.discover("stats")
 
-        if test("Returns dict", isinstance(stats, dict)):
-            results["passed"] += 1
-        else:
-            results["failed"] += 1
-
-        if test("Contains 'scar_exchanges'", "scar_exchanges" in stats):
-            results["passed"] += 1
-        else:
-            results["failed"] += 1
-
-        if test("Contains 'total_packets'", "total_packets" in stats, f"total_packets={stats.get('total_packets')}"):
-            results["passed"] += 1
-        else:
-            results["failed"] += 1
-
-        if test("scar_exchanges is dict", isinstance(stats.get("scar_exchanges"), dict)):
-            results["passed"] += 1
-        else:
-            results["failed"] += 1
+        sec.check("Returns dict", isinstance(stats, dict))
+        sec.check("Contains 'scar_exchanges'", "scar_exchanges" in stats)
+        sec.check("Contains 'total_packets'", "total_packets" in stats,
+                  f"total_packets={stats.get('total_packets')}")
+        sec.check("scar_exchanges is dict", isinstance(stats.get("scar_exchanges"), dict))
 
     except Exception as e:
-        print(f"  {FAIL} discover:stats raised exception: {e}")
-        results["failed"] += 4
+        sec.error(f"discover:stats raised exception: {e}", 4)
+    return sec
 
-    # ============================================================
-    # Section 4: Endpoint caching - ~/.keep/endpoints.json
-    # ============================================================
-    section(4, "Endpoint caching - ~/.keep/endpoints.json")
 
+def section_cache(client: KeepClient) -> Section:
+    sec = Section(4)
     try:
         cache_dir = Path.home() / ".keep"
         cache_file = cache_dir / "endpoints.json"
@@ -197,142 +144,154 @@ def main():
         info = client.discover("info")
         KeepClient.cache_endpoint(HOST, PORT, info)
 
-        if test("Cache file created", cache_file.exists()):
-            results["passed"] += 1
-        else:
-            results["failed"] += 1
+        sec.check("Cache file created", cache_file.exists())
 
         # Read and validate cache
         cache_data = json.loads(cache_file.read_text())
-
-        if test("Cache has 'endpoints' key", "endpoints" in cache_data):
-            results["passed"] += 1
-        else:
-            results["failed"] += 1
+        sec.check("Cache has 'endpoints' key", "endpoints" in cache_data)
 
         endpoints = cache_data.get("endpoints", [])
-        if test("Cache has at least 1 endpoint", len(endpoints) >= 1):
-            results["passed"] += 1
-        else:
-            results["failed"] += 1
+        sec.check("Cache has at least 1 endpoint", len(endpoints) >= 1)
 
         if endpoints:
             ep = endpoints[0]
-            if test("Endpoint has host", ep.get("host") == HOST):
-                results["passed"] += 1
-            else:
-                results["failed"] += 1
-
-            if test("Endpoint has port", ep.get("port") == PORT):
-                results["passed"] += 1
-            else:
-                results["failed"] += 1
-
-            if test("Endpoint has version", "version" in ep, f"version={ep.get('version')}"):
-                results["passed"] += 1
-            else:
-                results["failed"] += 1
-
-            if test("Endpoint has last_seen timestamp", "last_seen" in ep, f"last_seen={ep.get('last_seen')}"):
-                results["passed"] += 1
-            else:
-                results["failed"] += 1
+            sec.check("Endpoint has host", ep.get("host") == HOST)
+            sec.check("Endpoint has port", ep.get("port") == PORT)
+            sec.check("Endpoint has version", "version" in ep, f"version={ep.get('version')}")
+            sec.check("Endpoint has last_seen timestamp", "last_seen" in ep,
+                      f"last_seen={ep.get('last_seen')}")
 
     except Exception as e:
-        print(f"  {FAIL} Endpoint caching raised exception: {e}")
-        results["failed"] += 7
+        sec.error(f"Endpoint caching raised exception: {e}", 7)
+    return sec
 
-    # ============================================================
-    # Section 5: from_cache() - Client reconnection
-    # ============================================================
-    section(5, "from_cache() - Client reconnection")
 
+def section_from_cache() -> Section:
+    sec = Section(5)
     try:
         # Reconnect using cached endpoints
         cached_client = KeepClient.from_cache(src="bot:kp10-test-cached")
-
-        if test("from_cache() returns KeepClient", isinstance(cached_client, KeepClient)):
-            results["passed"] += 1
-        else:
-            results["failed"] += 1
+        sec.check("from_cache() returns KeepClient", isinstance(cached_client, KeepClient))
 
         # Verify cached client can discover
         info = cached_client.discover("info")
-        if test("Cached client can call discover()", "version" in info):
-            results["passed"] += 1
-        else:
-            results["failed"] += 1
+        sec.check("Cached client can call discover()", "version" in info)
 
     except Exception as e:
-        print(f"  {FAIL} from_cache() raised exception: {e}")
-        results["failed"] += 2
+        sec.error(f"from_cache() raised exception: {e}", 2)
+    return sec
 
-    # ============================================================
-    # Section 6: Scar logging - Verify scar packets tracked
-    # ============================================================
-    section(6, "Scar logging - Verify scar packets tracked")
 
+def section_scar(client: KeepClient) -> Section:
+    sec = Section(6)
     try:
         # Get baseline stats
         stats_before = client.discover("stats")
         packets_before = stats_before.get("total_packets", 0)
 
-        # Send a packet with scar data
+        # Send a packet with scar data from a separate client, so the shared
+        # connection is not re-registered under the scar sender's identity
         test_scar = b"test-scar-data-kp10"
         scar_client = KeepClient(HOST, PORT, src="bot:kp10-scar-test")
         reply = scar_client.send(body="scar test", dst="server", scar=test_scar)
-
-        if test("Scar packet accepted (reply=done)", reply.body == "done"):
-            results["passed"] += 1
-        else:
-            results["failed"] += 1
+        sec.check("Scar packet accepted (reply=done)", reply.body == "done")
 
         # Get stats after
         stats_after = client.discover("stats")
         packets_after = stats_after.get("total_packets", 0)
-
-        if test("total_packets incremented", packets_after > packets_before,
-                f"before={packets_before}, after={packets_after}"):
-            results["passed"] += 1
-        else:
-            results["failed"] += 1
+        sec.check("total_packets incremented", packets_after > packets_before,
+                  f"before={packets_before}, after={packets_after}")
 
         # Check scar_exchanges has our agent
         scar_exchanges = stats_after.get("scar_exchanges", {})
-        if test("scar_exchanges tracks scar sender", "bot:kp10-scar-test" in scar_exchanges,
-                f"scar_exchanges={scar_exchanges}"):
-            results["passed"] += 1
-        else:
-            results["failed"] += 1
+        sec.check("scar_exchanges tracks scar sender", "bot:kp10-scar-test" in scar_exchanges,
+                  f"scar_exchanges={scar_exchanges}")
 
     except Exception as e:
-        print(f"  {FAIL} Scar logging raised exception: {e}")
-        results["failed"] += 3
+        sec.error(f"Scar logging raised exception: {e}", 3)
+    return sec
 
-    # ============================================================
-    # Section 7: Error handling - Unknown discovery type
-    # ============================================================
-    section(7, "Error handling - Unknown discovery type")
 
+def section_unknown(client: KeepClient) -> Section:
+    sec = Section(7)
     try:
         bad_response = client.discover("invalid_type_xyz")
 
         # Should return error:unknown_discovery
-        if test("Unknown type returns error",
-                bad_response == "error:unknown_discovery" or
-                (isinstance(bad_response, dict) and "error" in str(bad_response))):
-            results["passed"] += 1
-        else:
-            print(f"        Got: {bad_response}")
-            results["failed"] += 1
+        if not sec.check("Unknown type returns error",
+                         bad_response == "error:unknown_discovery" or
+                         (isinstance(bad_response, dict) and "error" in str(bad_response))):
+            sec.lines.append(f"        Got: {bad_response}")
 
     except json.JSONDecodeError:
         # If response is not JSON, might be raw error string
-        print(f"  {PASS} Server returned non-JSON error (expected)")
-        results["passed"] += 1
+        sec.lines.append(f"  {PASS} Server returned non-JSON error (expected)")
+        sec.passed += 1
     except Exception as e:
-        print(f"  {FAIL} Unknown discovery type raised exception: {e}")
+        sec.error(f"Unknown discovery type raised exception: {e}", 1)
+    return sec
+
+
+def main():
+    results = {"passed": 0, "failed": 0, "skipped": 0}
+
+    print(f"\nKP-10: Testing KP-7 Discovery Features")
+    print(f"Target: {HOST}:{PORT}")
+    print(f"{'='*60}")
+
+    started = time.perf_counter_ns()
+
+    # Verify server connectivity first
+    try:
+        client = KeepClient(HOST, PORT, timeout=5.0)
+        reply = client.send(body="ping", dst="server")
+        if reply.body != "done":
+            print(f"\n{FAIL} Server not responding correctly (got: {reply.body})")
+            return 1
+    except Exception as e:
+        print(f"\n{FAIL} Cannot connect to server at {HOST}:{PORT}")
+        print(f"    Error: {e}")
+        print(f"\nStart server first:")
+        print(f"    go build -o keep . && ./keep")
+        print(f"    OR")
+        print(f"    docker build -t keep-server . && docker run -p 9009:9009 keep-server")
+        return 1
+
+    print(f"{PASS} Server connection verified")
+
+    # Sections 1, 2, 3 and 7 are read-only discover calls: run them
+    # concurrently, each on its own client. The server keeps one connection
+    # per src and closes the older one when a src registers again, so
+    # threads sharing an identity would lose replies.
+    parallel_sections = {1: section_info, 2: section_agents, 3: section_stats, 7: section_unknown}
+
+    def run_parallel(item):
+        num, run = item
+        return run(KeepClient(HOST, PORT, timeout=5.0, src=f"bot:kp10-section-{num}"))
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        parallel = list(pool.map(run_parallel, parallel_sections.items()))
+
+    # Sections 4-6 depend on cache and stats ordering: run them in order on
+    # one persistent connection instead of a handshake per call.
+    with client:
+        sequential = [section_cache(client), section_from_cache(), section_scar(client)]
+
+    sections = sorted(parallel + sequential, key=lambda sec: sec.num)
+    for sec in sections:
+        sec.print()
+        results["passed"] += sec.passed
+        results["failed"] += sec.failed
+
+    elapsed = (time.perf_counter_ns() - started) / 1e9
+    timing = Section(0)
+    if timing.check(f"Finished within {MAX_SECONDS:g}s", elapsed <= MAX_SECONDS, f"elapsed={elapsed:.3f}s"):
+        results["passed"] += 1
+    else:
         results["failed"] += 1
+    print()
+    for line in timing.lines:
+        print(line)
 
     # ============================================================
     # Summary